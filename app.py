@@ -3,18 +3,27 @@ Flask API server for the Electrical Supply Cost Estimation System.
 Serves the HTML frontend and provides API endpoints.
 """
 
+import atexit
 import csv
 import json
 import logging
 import os
+import queue
 import re
 import sys
 import tempfile
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 from flask import Flask, jsonify, request, send_from_directory
 from flask_cors import CORS
 
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
 # Setup paths — when running as a PyInstaller exe, use the exe's directory
 if getattr(sys, 'frozen', False):
     BASE_DIR = Path(sys.executable).parent
@@ -23,16 +32,27 @@ else:
 DATA_DIR = BASE_DIR / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
-# Setup logging
-logging.basicConfig(
-    filename=str(DATA_DIR / 'process.log'),
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(module)s - %(message)s'
-)
+# Setup logging. Records are queued and written to the log file by a
+# listener thread, so request threads never wait on file I/O; the file
+# itself is only opened on the first record.
+_log_file_handler = logging.FileHandler(str(DATA_DIR / 'process.log'), delay=True)
+_log_file_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(levelname)s - %(module)s - %(message)s'))
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, _log_file_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+# The file handler applies the full format; queued records carry just the message
+_log_queue_handler = QueueHandler(_log_queue)
+_log_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[_log_queue_handler])
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__, static_folder=str(BASE_DIR / 'static'))
 CORS(app)
+# gzip/br JSON responses when flask-compress is installed
+if Compress is not None:
+    Compress(app)
 
 # ---------------------------------------------------------------------------
 # Lazy-loaded singletons
@@ -40,19 +60,85 @@ CORS(app)
 _labor_matcher = None
 LABOR_DB_PATH = str(DATA_DIR / "labor_units_db.csv")
 
+# Parsed labor DB plus lookup indexes, rebuilt only when the CSV's mtime changes
+_LABOR_ROWS = []
+_LABOR_MTIME = None
+_SECTIONS = []
+_CATS_BY_SECTION = {}
+_ITEMS_BY_SC = {}
+# Row indexes per section and per (section, category), in file order, for browse
+_BY_SECTION = {}
+_BY_SC = {}
+# Token of each row's combined_lower text -> row indexes
+_BROWSE_POSTINGS = {}
+_labor_lock = threading.Lock()
+
 
 def get_matcher():
+    """Return the shared LaborMatcher, rebuilt whenever the labor DB is reloaded."""
     global _labor_matcher
-    if _labor_matcher is None:
+    rows = load_labor_db()
+    if _labor_matcher is None or _labor_matcher.entries is not rows:
         from labor_matcher import LaborMatcher
-        _labor_matcher = LaborMatcher(LABOR_DB_PATH)
+        _labor_matcher = LaborMatcher(entries=rows)
     return _labor_matcher
 
 
 def load_labor_db():
-    """Load entire labor DB as list of dicts."""
-    with open(LABOR_DB_PATH, encoding='utf-8') as f:
-        return list(csv.DictReader(f))
+    """
+    Load entire labor DB as a list of LaborEntry records.
+    The CSV is parsed once and cached; it is only re-read if its mtime changes.
+    """
+    global _LABOR_ROWS, _LABOR_MTIME, _SECTIONS, _CATS_BY_SECTION, _ITEMS_BY_SC, \
+        _BY_SECTION, _BY_SC, _BROWSE_POSTINGS
+    mtime = os.stat(LABOR_DB_PATH).st_mtime_ns
+    if mtime == _LABOR_MTIME:
+        return _LABOR_ROWS
+
+    with _labor_lock:
+        if mtime != _LABOR_MTIME:
+            from labor_matcher import read_labor_entries
+            rows = read_labor_entries(LABOR_DB_PATH)
+
+            by_section = {}
+            by_sc = {}
+            postings = {}
+            for i, r in enumerate(rows):
+                by_section.setdefault(r.Section, []).append(i)
+                by_sc.setdefault((r.Section, r.Category), []).append(i)
+                for token in set(r.combined_lower.split()):
+                    postings.setdefault(token, []).append(i)
+            cats_by_section = {}
+            for section, category in by_sc:
+                cats_by_section.setdefault(section, set()).add(category)
+
+            _SECTIONS = sorted(cats_by_section)
+            _CATS_BY_SECTION = {s: sorted(c) for s, c in cats_by_section.items()}
+            _ITEMS_BY_SC = {sc: [rows[i] for i in ids] for sc, ids in by_sc.items()}
+            _BY_SECTION = by_section
+            _BY_SC = by_sc
+            _BROWSE_POSTINGS = postings
+            _LABOR_ROWS = rows
+            _LABOR_MTIME = mtime
+            logger.info(f"Loaded {len(rows)} labor DB rows from {LABOR_DB_PATH}")
+    return _LABOR_ROWS
+
+
+def _browse_matches(search: str) -> set:
+    """
+    Return indexes of the rows whose combined_lower text contains every word
+    of the search. Words match as substrings, so every indexed token is checked.
+    """
+    matched = None
+    for word in search.split():
+        ids = set()
+        for token, postings in _BROWSE_POSTINGS.items():
+            if word in token:
+                ids.update(postings)
+        matched = ids if matched is None else matched & ids
+        if not matched:
+            break
+    return matched
 
 
 # ---------------------------------------------------------------------------
@@ -74,18 +160,16 @@ def static_files(filename):
 @app.route('/api/labor/sections', methods=['GET'])
 def labor_sections():
     """Return list of unique sections from labor DB."""
-    rows = load_labor_db()
-    sections = sorted(set(r['Section'] for r in rows))
-    return jsonify(sections)
+    load_labor_db()
+    return jsonify(_SECTIONS)
 
 
 @app.route('/api/labor/categories', methods=['GET'])
 def labor_categories():
     """Return categories for a given section."""
     section = request.args.get('section', '')
-    rows = load_labor_db()
-    cats = sorted(set(r['Category'] for r in rows if r['Section'] == section))
-    return jsonify(cats)
+    load_labor_db()
+    return jsonify(_CATS_BY_SECTION.get(section, []))
 
 
 @app.route('/api/labor/items', methods=['GET'])
@@ -93,10 +177,8 @@ def labor_items():
     """Return items for a given section+category."""
     section = request.args.get('section', '')
     category = request.args.get('category', '')
-    rows = load_labor_db()
-    items = [r for r in rows
-             if r['Section'] == section and r['Category'] == category]
-    return jsonify(items)
+    load_labor_db()
+    return jsonify([r.to_dict() for r in _ITEMS_BY_SC.get((section, category), [])])
 
 
 @app.route('/api/labor/search', methods=['GET'])
@@ -111,10 +193,10 @@ def labor_search():
     out = []
     for entry, score, reason in results:
         out.append({
-            **entry,
+            **entry.to_dict(),
             'score': score,
             'reason': reason,
-            'display': f"{entry['Section']} > {entry['Category']} > {entry['Item']}"
+            'display': f"{entry.Section} > {entry.Category} > {entry.Item}"
         })
     return jsonify(out)
 
@@ -130,17 +212,29 @@ def labor_browse():
 
     rows = load_labor_db()
 
-    if section:
-        rows = [r for r in rows if r['Section'] == section]
-    if category:
-        rows = [r for r in rows if r['Category'] == category]
+    # Start from the narrowest precomputed index list
+    if section and category:
+        ids = _BY_SC.get((section, category), [])
+    elif section:
+        ids = _BY_SECTION.get(section, [])
+    else:
+        ids = range(len(rows))
+    if category and not section:
+        ids = [i for i in ids if rows[i].Category == category]
     if search:
-        rows = [r for r in rows if search in
-                f"{r['Section']} {r['Category']} {r['Item']}".lower()]
-
-    total = len(rows)
+        # Posting lists narrow the candidates; the exact substring check
+        # then only runs on those
+        if search.split():
+            matched = _browse_matches(search)
+            if section or category:
+                ids = [i for i in ids if i in matched]
+            else:
+                ids = sorted(matched)
+        ids = [i for i in ids if search in rows[i].combined_lower]
+
+    total = len(ids)
     start = (page - 1) * per_page
-    page_rows = rows[start:start + per_page]
+    page_rows = [rows[i].to_dict() for i in ids[start:start + per_page]]
 
     return jsonify({
         'total': total,
@@ -175,22 +269,21 @@ def run_estimate():
         return jsonify({'error': 'No parts provided'}), 400
 
     matcher = get_matcher()
-    from cost_calculator import parse_quantity, calculate_labor_extension
-    from price_scraper import scrape_vendor
+    from cost_calculator import parse_quantity, calculate_labor_extensions
+    from price_scraper import scrape_many
 
-    results = []
-    for part in parts:
-        desc = part.get('description', '').strip()
-        if not desc:
-            continue
+    # Labor match for every described part in one batch
+    described = [(part, part.get('description', '').strip()) for part in parts]
+    described = [(part, desc) for part, desc in described if desc]
+    matches = matcher.best_match_many([desc for _, desc in described])
 
+    results = []
+    labored = []  # (row, qty, labor_value, labor_unit) for matched parts
+    for (part, desc), (labor_entry, confidence, match_reason) in zip(described, matches):
         qty_raw = str(part.get('quantity', '0'))
         qty, qty_unit = parse_quantity(qty_raw)
         platt_id = re.sub(r'^Platt#', '', str(part.get('platt_id', ''))).strip()
 
-        # Labor match
-        labor_entry, confidence, match_reason = matcher.best_match(desc)
-
         row = {
             'part': desc,
             'quantity': qty,
@@ -199,20 +292,20 @@ def run_estimate():
         }
 
         if labor_entry and confidence > 30:
-            labor_val = float(labor_entry.get(condition, labor_entry.get('Average', 0)))
-            labor_unit = labor_entry['Unit']
-            labor_ext = calculate_labor_extension(qty, qty_unit, labor_val, labor_unit)
+            labor_val = labor_entry.labor_value(condition)
+            labor_unit = labor_entry.Unit
             row.update({
-                'labor_match': f"{labor_entry['Section']} > {labor_entry['Category']} > {labor_entry['Item']}",
-                'labor_section': labor_entry['Section'],
-                'labor_category': labor_entry['Category'],
-                'labor_item': labor_entry['Item'],
+                'labor_match': f"{labor_entry.Section} > {labor_entry.Category} > {labor_entry.Item}",
+                'labor_section': labor_entry.Section,
+                'labor_category': labor_entry.Category,
+                'labor_item': labor_entry.Item,
                 'labor_confidence': confidence,
                 'labor_value': labor_val,
                 'labor_unit': labor_unit,
-                'labor_hours': round(labor_ext, 2),
-                'labor_cost': round(labor_ext * labor_rate, 2),
+                'labor_hours': 0,  # extended below for all matched parts at once
+                'labor_cost': 0,
             })
+            labored.append((row, qty, labor_val, labor_unit))
         else:
             row.update({
                 'labor_match': 'NEEDS MANUAL LOOKUP',
@@ -223,9 +316,23 @@ def run_estimate():
                 'labor_cost': 0,
             })
 
-        # Price
-        if fetch_prices and desc:
-            price_result = scrape_vendor(desc, "platt", platt_id)
+        results.append(row)
+
+    if labored:
+        labored_rows, qtys, labor_vals, labor_units = zip(*labored)
+        labor_hours = calculate_labor_extensions(qtys, labor_vals, labor_units)
+        for row, labor_ext in zip(labored_rows, labor_hours.tolist()):
+            row['labor_hours'] = round(labor_ext, 2)
+            row['labor_cost'] = round(labor_ext * labor_rate, 2)
+
+    # Price lookups are network-bound, so run them concurrently
+    if fetch_prices:
+        prices = scrape_many([(row['part'], row['platt_id']) for row in results])
+    else:
+        prices = [None] * len(results)
+
+    for row, price_result in zip(results, prices):
+        if price_result:
             row.update({
                 'platt_price': price_result['price'],
                 'platt_price_str': price_result['price_str'],
@@ -233,7 +340,7 @@ def run_estimate():
                 'platt_url': price_result['url'],
                 'platt_stock': price_result['stock'],
                 'price_error': price_result['error'] or '',
-                'material_cost': round(price_result['price'] * qty, 2) if price_result['price'] > 0 else 0,
+                'material_cost': round(price_result['price'] * row['quantity'], 2) if price_result['price'] > 0 else 0,
             })
         else:
             row.update({
@@ -247,7 +354,6 @@ def run_estimate():
             })
 
         row['total_cost'] = round(row.get('labor_cost', 0) + row.get('material_cost', 0), 2)
-        results.append(row)
 
     # Compute totals
     totals = {
@@ -279,9 +385,9 @@ def export_estimate():
     est_path = str(DATA_DIR / 'project_estimate.csv')
     fieldnames = list(results[0].keys())
     with open(est_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(results)
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(tuple(r.get(k, '') for k in fieldnames) for r in results)
 
     # Write summary_report.txt
     report_path = str(DATA_DIR / 'summary_report.txt')
@@ -321,4 +427,9 @@ if __name__ == '__main__':
 
     print("Starting Electrical Estimator Web UI...")
     print("Open http://localhost:5000 in your browser")
-    app.run(host='127.0.0.1', port=5000, debug=True)
+    try:
+        from waitress import serve
+    except ImportError:
+        app.run(host='127.0.0.1', port=5000, debug=False, use_reloader=False)
+    else:
+        serve(app, host='127.0.0.1', port=5000, threads=8)
@@ -7,11 +7,18 @@ import csv
 import re
 import logging
 from pathlib import Path
+import numpy as np
 from labor_matcher import LaborMatcher
-from price_scraper import batch_scrape, scrape_vendor
+from price_scraper import batch_scrape, scrape_many
 
 logger = logging.getLogger(__name__)
 
+# Leading number (commas allowed) with an optional unit word
+_QTY_RE = re.compile(r'([\d,]+\.?\d*)\s*(feet|ft|foot|ea|each|lot|box)?', re.I)
+
+# Labor unit divisors: E=each, C=per hundred, M=per thousand
+_LABOR_DIV = {'E': 1.0, 'C': 100.0, 'M': 1000.0}
+
 
 def parse_quantity(qty_str: str) -> tuple:
     """
@@ -19,7 +26,7 @@ def parse_quantity(qty_str: str) -> tuple:
     Returns (numeric_value, unit_suffix).
     """
     qty_str = str(qty_str).strip()
-    match = re.match(r'([\d,]+\.?\d*)\s*(feet|ft|foot|ea|each|lot|box)?', qty_str, re.I)
+    match = _QTY_RE.match(qty_str)
     if match:
         val = float(match.group(1).replace(',', ''))
         unit = (match.group(2) or '').lower()
@@ -36,13 +43,13 @@ def calculate_labor_extension(qty: float, qty_unit: str, labor_value: float, lab
     Calculate labor hours extension.
     Labor units: E=each, C=per hundred, M=per thousand
     """
-    if labor_unit == 'E':
-        return qty * labor_value
-    elif labor_unit == 'C':
-        return (qty / 100) * labor_value
-    elif labor_unit == 'M':
-        return (qty / 1000) * labor_value
-    return qty * labor_value
+    return qty / _LABOR_DIV.get(labor_unit, 1.0) * labor_value
+
+
+def calculate_labor_extensions(qtys, labor_values, labor_units) -> np.ndarray:
+    """Labor hours extension for a whole parts list in one array expression."""
+    divisors = np.array([_LABOR_DIV.get(u, 1.0) for u in labor_units], dtype=np.float64)
+    return np.asarray(qtys, dtype=np.float64) / divisors * np.asarray(labor_values, dtype=np.float64)
 
 
 def load_parts_list(csv_path: str) -> list:
@@ -64,6 +71,12 @@ def load_parts_list(csv_path: str) -> list:
     return parts
 
 
+def _print_price(part: str, result: dict):
+    """scrape_many() progress callback: one line per priced part."""
+    note = result['error'] or result['price_str']
+    print(f"  [PRICE] {part[:40]:40s} -> {note}")
+
+
 def run_estimation(parts_csv: str, labor_db: str = "data/labor_units_db.csv",
                    output_csv: str = "data/project_estimate.csv",
                    labor_rate: float = 85.0,
@@ -93,6 +106,7 @@ def run_estimation(parts_csv: str, labor_db: str = "data/labor_units_db.csv",
     results = []
 
     print("\nMatching parts to labor units...")
+    described = []
     for part in parts:
         # Get part description - try various column names
         desc = (part.get('Part', '') or
@@ -100,9 +114,13 @@ def run_estimation(parts_csv: str, labor_db: str = "data/labor_units_db.csv",
                 part.get('Description', '') or
                 list(part.values())[0] if part else '')
 
-        if not desc:
-            continue
+        if desc:
+            described.append((part, desc))
+
+    # Match every part to the labor database in one batch
+    matches = matcher.best_match_many([desc for _, desc in described])
 
+    for (part, desc), (labor_entry, confidence, match_reason) in zip(described, matches):
         # Get quantity
         qty_str = (part.get('Quantity', '') or
                    part.get('Qty', '') or '')
@@ -116,9 +134,6 @@ def run_estimation(parts_csv: str, labor_db: str = "data/labor_units_db.csv",
         if platt_id:
             platt_id = re.sub(r'^Platt#', '', platt_id).strip()
 
-        # Match to labor database
-        labor_entry, confidence, match_reason = matcher.best_match(desc)
-
         row = {
             'Part': desc,
             'Quantity': qty,
@@ -127,12 +142,12 @@ def run_estimation(parts_csv: str, labor_db: str = "data/labor_units_db.csv",
         }
 
         if labor_entry and confidence > 30:
-            labor_val = float(labor_entry.get(condition, labor_entry.get('Average', 0)))
-            labor_unit = labor_entry['Unit']
+            labor_val = labor_entry.labor_value(condition)
+            labor_unit = labor_entry.Unit
             labor_ext = calculate_labor_extension(qty, qty_unit, labor_val, labor_unit)
 
             row.update({
-                'Labor_Match': f"{labor_entry['Section']} > {labor_entry['Category']} > {labor_entry['Item']}",
+                'Labor_Match': f"{labor_entry.Section} > {labor_entry.Category} > {labor_entry.Item}",
                 'Labor_Confidence': confidence,
                 'Labor_Value': labor_val,
                 'Labor_Unit': labor_unit,
@@ -149,9 +164,22 @@ def run_estimation(parts_csv: str, labor_db: str = "data/labor_units_db.csv",
                 'Labor_Cost': 0,
             })
 
-        # Price lookup
-        if fetch_prices:
-            price_result = scrape_vendor(desc, "platt", platt_id)
+        results.append(row)
+
+        # Print progress
+        status = "OK" if confidence > 50 else "LOW CONFIDENCE" if confidence > 30 else "NEEDS REVIEW"
+        print(f"  [{status}] {desc[:40]:40s} -> Labor: {row['Labor_Hours']:>8.2f} hrs")
+
+    # Price lookups are network-bound, so run them concurrently
+    if fetch_prices:
+        print(f"\nFetching prices for {len(results)} parts...")
+        prices = scrape_many([(row['Part'], row['Platt_ID']) for row in results],
+                             progress=_print_price)
+    else:
+        prices = [None] * len(results)
+
+    for row, price_result in zip(results, prices):
+        if price_result:
             row.update({
                 'Platt_Price': price_result['price'],
                 'Platt_Price_Str': price_result['price_str'],
@@ -162,7 +190,7 @@ def run_estimation(parts_csv: str, labor_db: str = "data/labor_units_db.csv",
             })
             # Calculate material extension
             if price_result['price'] > 0:
-                row['Material_Cost'] = round(price_result['price'] * qty, 2)
+                row['Material_Cost'] = round(price_result['price'] * row['Quantity'], 2)
             else:
                 row['Material_Cost'] = 0
         else:
@@ -177,20 +205,15 @@ def run_estimation(parts_csv: str, labor_db: str = "data/labor_units_db.csv",
             })
 
         row['Total_Cost'] = round(row.get('Labor_Cost', 0) + row.get('Material_Cost', 0), 2)
-        results.append(row)
-
-        # Print progress
-        status = "OK" if confidence > 50 else "LOW CONFIDENCE" if confidence > 30 else "NEEDS REVIEW"
-        print(f"  [{status}] {desc[:40]:40s} -> Labor: {row['Labor_Hours']:>8.2f} hrs")
 
     # Write output CSV
     if results:
         Path(output_csv).parent.mkdir(parents=True, exist_ok=True)
         fieldnames = list(results[0].keys())
         with open(output_csv, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(results)
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+            writer.writerows(tuple(r.get(k, '') for k in fieldnames) for r in results)
         print(f"\nEstimate written to {output_csv}")
 
     return results
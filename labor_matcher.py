@@ -4,9 +4,14 @@ Handles variations like 3/4" vs 3/4 vs .75, emt vs EMT, etc.
 """
 
 import csv
+import functools
+import math
+import operator
 import re
 import logging
-from thefuzz import fuzz
+from dataclasses import dataclass, field
+import numpy as np
+from rapidfuzz import fuzz, process, utils
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -22,6 +27,15 @@ SIZE_ALIASES = {
     '2.5': '2 1/2',
     '3.5': '3 1/2',
 }
+# All size aliases in one pass; longest first so '1.5' wins over its '.5' suffix
+_SIZE_ALIAS_RE = re.compile(
+    r'\b(' + '|'.join(re.escape(a) for a in sorted(SIZE_ALIASES, key=len, reverse=True)) + r')\b'
+)
+_WHITESPACE_RE = re.compile(r'\s+')
+# Sizes like 3/4, 1/2, 1 1/4, #10, etc. anywhere in a description
+_SIZE_RE_IN_DESC = re.compile(r'(\d+\s+\d+/\d+|\d+/\d+|\d+)')
+# A labor DB item that is only a size, like 3/4 or 1 1/2
+_SIZE_RE_ITEM = re.compile(r'^(\d+\s+\d+/\d+|\d+/\d+)\s*$')
 
 # Common part type aliases for matching
 TYPE_ALIASES = {
@@ -44,23 +58,78 @@ TYPE_ALIASES = {
     'receptacle': ['RECEPTACLES'],
 }
 
+# Weight of the 0-100 fuzzy similarity in an entry's score, and the score an
+# entry must exceed to be returned by search()
+FUZZY_WEIGHT = 0.3
+SCORE_CUTOFF = 20
 
+# Max distinct descriptions remembered by LaborMatcher.best_match()
+BEST_MATCH_CACHE_SIZE = 8192
+
+# One bit per TYPE_ALIASES key, in dict order
+_ALIAS_BITS = {alias: 1 << i for i, alias in enumerate(TYPE_ALIASES)}
+# Finds every alias occurring anywhere in a query (substring match, like
+# "fan" in "fans"); the lookahead lets matches overlap
+_ALIAS_RE = re.compile(
+    '(?=(' + '|'.join(re.escape(a) for a in sorted(TYPE_ALIASES, key=len, reverse=True)) + '))'
+)
+
+# Conduit types that get a penalty when an entry's section names a
+# different type than the one in the query
+CONDUIT_TYPES = ['emt', 'rigid', 'pvc', 'imc', 'ent', 'mc']
+
+
+# Latin-1 characters are dropped before fuzzy scoring (same as thefuzz's force_ascii)
+_ASCII_ONLY = dict.fromkeys(range(128, 256))
+
+
+def _fuzzy_process(text: str) -> str:
+    """Prepare text for fuzzy scoring: ASCII only, lowercase, alphanumeric tokens."""
+    return utils.default_process(text.translate(_ASCII_ONLY))
+
+
+def _pair_fuzzy_scores(queries: list, choices: list) -> np.ndarray:
+    """
+    token_set_ratio of queries[k] vs choices[k] for every k, in one batched
+    call, rounded the same way thefuzz's token_set_ratio did.
+    """
+    if not queries:
+        return np.zeros(0, dtype=np.int64)
+    return np.rint(process.cpdist(queries, choices, scorer=fuzz.token_set_ratio,
+                                  dtype=np.float64, workers=-1)).astype(np.int64)
+
+
+def _top_order(scores: np.ndarray, top_n: int) -> np.ndarray:
+    """
+    Positions of the top_n highest scores, best first. Equal scores keep
+    their original order, like sorted(..., reverse=True).
+    """
+    if top_n <= 0:
+        return np.empty(0, dtype=np.intp)
+    candidates = np.arange(len(scores))
+    if top_n < len(scores):
+        # Keep every score tied with the top_n-th best so the stable sort
+        # below decides ties
+        kth = np.partition(scores, -top_n)[-top_n]
+        candidates = np.flatnonzero(scores >= kth)
+    order = np.argsort(-scores[candidates], kind='stable')
+    return candidates[order[:top_n]]
+
+
+@functools.lru_cache(maxsize=8192)
 def normalize_description(desc: str) -> str:
     """Normalize a part description for matching."""
     desc = desc.lower().strip()
     # Remove quotes and extra whitespace
     desc = desc.replace('"', ' inch ').replace("'", ' ')
-    desc = re.sub(r'\s+', ' ', desc).strip()
+    desc = _WHITESPACE_RE.sub(' ', desc).strip()
     # Normalize sizes
-    for alias, normalized in SIZE_ALIASES.items():
-        desc = re.sub(r'\b' + re.escape(alias) + r'\b', normalized, desc)
-    return desc
+    return _SIZE_ALIAS_RE.sub(lambda m: SIZE_ALIASES[m.group(0)], desc)
 
 
 def extract_size(desc: str) -> str:
     """Extract pipe/conduit size from description."""
-    # Match patterns like 3/4, 1/2, 1 1/4, #10, etc.
-    size_match = re.search(r'(\d+\s+\d+/\d+|\d+/\d+|\d+)', desc)
+    size_match = _SIZE_RE_IN_DESC.search(desc)
     if size_match:
         return size_match.group(1).strip()
     return ""
@@ -69,105 +138,320 @@ def extract_size(desc: str) -> str:
 def extract_size_from_item(item: str) -> str:
     """Extract size from a labor DB item field like '3/4\"' or '1 1/2\"'."""
     item = item.replace('"', '').replace("''", '').strip()
-    size_match = re.match(r'^(\d+\s+\d+/\d+|\d+/\d+)\s*$', item)
+    size_match = _SIZE_RE_ITEM.match(item)
     if size_match:
         return size_match.group(1)
     return ""
 
 
+# Labor DB columns, in CSV order
+LABOR_FIELDS = ('Section', 'Category', 'Item', 'Easy', 'Average', 'Difficult',
+                'Remodel', 'Old_Work', 'Unit')
+# Working-condition columns; any other condition falls back to Average
+LABOR_CONDITIONS = ('Easy', 'Average', 'Difficult', 'Remodel', 'Old_Work')
+
+
+@dataclass(slots=True, frozen=True)
+class LaborEntry:
+    """One labor DB row. Values are kept as the strings read from the CSV."""
+    Section: str
+    Category: str
+    Item: str
+    Easy: str
+    Average: str
+    Difficult: str
+    Remodel: str
+    Old_Work: str
+    Unit: str
+    # Lowercased "section category item", for substring filters
+    combined_lower: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'combined_lower',
+                           f"{self.Section} {self.Category} {self.Item}".lower())
+
+    def labor_value(self, condition: str) -> float:
+        """Labor units for a working condition (Average if it isn't one)."""
+        return float(getattr(self, condition if condition in LABOR_CONDITIONS else 'Average'))
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in LABOR_FIELDS}
+
+
+def read_labor_entries(db_path) -> list:
+    """Read the labor DB CSV into a list of LaborEntry records."""
+    with open(db_path, encoding='utf-8') as f:
+        reader = csv.reader(f)
+        idx = {name: i for i, name in enumerate(next(reader))}
+        fields = operator.itemgetter(*(idx[name] for name in LABOR_FIELDS))
+        return [LaborEntry(*fields(row)) for row in reader if row]
+
+
 class LaborMatcher:
-    def __init__(self, db_path: str = "data/labor_units_db.csv"):
+    def __init__(self, db_path: str = "data/labor_units_db.csv", entries: list = None):
+        """
+        Load entries from the CSV at db_path, or use an already-parsed
+        list of LaborEntry records if one is passed in (skips re-reading the CSV).
+        """
         self.entries = []
-        self.load_db(db_path)
+        self._rows = []
+        self._choices = []
+        self._postings = {}
+        self._entry_type_bits = []
+        self._alias_postings = {}
+        self._size_postings = {}
+        self._conduit_matrix = None
+        self._conduit_counts = None
+        self._best_match_cache = {}
+        if entries is not None:
+            self.entries = entries
+            self._build_rows()
+        else:
+            self.load_db(db_path)
 
     def load_db(self, db_path: str):
-        with open(db_path, encoding='utf-8') as f:
-            self.entries = list(csv.DictReader(f))
+        self.entries = read_labor_entries(db_path)
+        self._build_rows()
         logger.info(f"Loaded {len(self.entries)} labor unit entries")
 
+    def _build_rows(self):
+        """
+        Precompute the normalized text used by search() for every entry, as
+        (entry, section_lower, category_lower, item_lower, combined,
+         section_tokens, entry_size) tuples.
+        """
+        self._best_match_cache = {}
+        rows = []
+        for entry in self.entries:
+            section_lower = entry.Section.lower()
+            category_lower = entry.Category.lower()
+            item_lower = entry.Item.lower().replace('"', '')
+            combined = f"{section_lower} {category_lower} {item_lower}"
+            entry_size = extract_size_from_item(entry.Item) or extract_size(item_lower)
+            rows.append((entry, section_lower, category_lower, item_lower, combined,
+                         set(section_lower.split()), entry_size))
+        self._rows = rows
+        self._choices = [_fuzzy_process(row[4]) for row in rows]
+
+        # Inverted indexes (value -> entry indexes, ascending) used to find
+        # search candidates without scanning every entry
+        postings = {}
+        size_postings = {}
+        for i, row in enumerate(rows):
+            for token in set(row[4].split()):
+                postings.setdefault(token, []).append(i)
+            if row[6]:
+                size_postings.setdefault(row[6], []).append(i)
+        self._postings = postings
+        self._size_postings = {size: np.array(ids, dtype=np.intp)
+                               for size, ids in size_postings.items()}
+
+        # Bitmask of the type aliases whose targets appear in each entry
+        targets_lower = [(_ALIAS_BITS[alias], [t.lower() for t in targets])
+                         for alias, targets in TYPE_ALIASES.items()]
+        self._entry_type_bits = [
+            sum(bit for bit, targets in targets_lower
+                if any(t in row[4] for t in targets))
+            for row in rows
+        ]
+        self._alias_postings = {
+            alias: np.array([i for i, bits in enumerate(self._entry_type_bits) if bits & bit],
+                            dtype=np.intp)
+            for alias, bit in _ALIAS_BITS.items()
+        }
+
+        # Which CONDUIT_TYPES each entry's section names, for the wrong-type penalty
+        self._conduit_matrix = np.array(
+            [[ct in row[5] for row in rows] for ct in CONDUIT_TYPES], dtype=np.int64
+        ).reshape(len(CONDUIT_TYPES), len(rows))
+        self._conduit_counts = self._conduit_matrix.sum(axis=0)
+
     def search(self, query: str, top_n: int = 5) -> list:
         """
         Search for matching labor entries given a part description.
         Returns list of (entry, score, match_reason) tuples.
         """
-        query_norm = normalize_description(query)
-        query_size = extract_size(query_norm)
-        results = []
+        return self._search_many([query], top_n)[0]
+
+    def _search_many(self, queries: list, top_n: int) -> list:
+        """
+        Run search() for several queries at once; returns one result list per
+        query.
 
-        # First try keyword-based matching
-        keywords = self._extract_keywords(query_norm)
+        Scoring runs in two stages. The prescore (type alias, conduit type,
+        size and keyword terms) is computed for every entry with array
+        operations. The fuzzy term adds at most FUZZY_WEIGHT * 100 points, so
+        it is only computed for entries that can still make a query's top_n,
+        and the surviving (query, entry) pairs of all queries are fuzzy-scored
+        in one batched call.
+        """
+        max_fuzzy = FUZZY_WEIGHT * 100
+        choices = self._choices
+        plans = []
+        pair_queries = []
+        pair_choices = []
+        for query in queries:
+            query_norm = normalize_description(query)
+            terms = self._query_terms(query_norm)
+            prescores = self._prescores(terms)
 
-        for entry in self.entries:
-            score = 0
-            reasons = []
+            # Final scores are >= prescores, so the top_n-th best prescore is a
+            # lower bound for the top_n-th best final score. Entries that
+            # cannot get within max_fuzzy of it are skipped; the 0.2 slack
+            # keeps any entry that could still tie with it once scores are
+            # rounded.
+            floor = -math.inf
+            if 0 < top_n <= len(prescores):
+                floor = np.partition(prescores, -top_n)[-top_n] - max_fuzzy - 0.2
+            survivors = np.flatnonzero((prescores >= floor) &
+                                       (prescores + max_fuzzy > SCORE_CUTOFF))
+            plans.append((terms, survivors, prescores[survivors]))
 
-            section_lower = entry['Section'].lower()
-            category_lower = entry['Category'].lower()
-            item_lower = entry['Item'].lower().replace('"', '')
+            query_fuzzy = _fuzzy_process(query_norm)
+            pair_queries.extend([query_fuzzy] * len(survivors))
+            pair_choices.extend(choices[i] for i in survivors.tolist())
 
-            # Build a combined text for fuzzy matching
-            combined = f"{section_lower} {category_lower} {item_lower}"
+        fuzzy_scores = _pair_fuzzy_scores(pair_queries, pair_choices)
 
-            # Check type aliases
-            for alias, targets in TYPE_ALIASES.items():
-                if alias in query_norm:
-                    for target in targets:
-                        if target.lower() in combined:
-                            score += 40
-                            reasons.append(f"type_match:{alias}")
-                            break
-
-            # Penalize entries where the section/category is about a
-            # DIFFERENT conduit type than what was queried
-            conduit_types = ['emt', 'rigid', 'pvc', 'imc', 'ent', 'mc']
-            query_conduit = None
-            for ct in conduit_types:
-                if ct in query_norm.split():
-                    query_conduit = ct
-                    break
-            if query_conduit:
-                # If query is for EMT, penalize entries in ENT/RIGID/PVC sections
-                for ct in conduit_types:
-                    if ct != query_conduit and ct in section_lower.split():
-                        score -= 25
-                        reasons.append(f"wrong_type_penalty:{ct}")
-
-            # Size matching
-            if query_size:
-                entry_size = extract_size_from_item(entry['Item'])
-                if not entry_size:
-                    entry_size = extract_size(item_lower)
-                if entry_size == query_size:
-                    score += 30
-                    reasons.append(f"size_match:{query_size}")
-
-            # Keyword matching
-            for kw in keywords:
-                if kw in combined:
-                    score += 15
-                    reasons.append(f"keyword:{kw}")
-
-            # Fuzzy match on combined text
-            fuzzy_score = fuzz.token_set_ratio(query_norm, combined)
-            score += fuzzy_score * 0.3
-            if fuzzy_score > 60:
-                reasons.append(f"fuzzy:{fuzzy_score}")
-
-            if score > 20:
-                results.append((entry, round(score, 1), ', '.join(reasons)))
-
-        results.sort(key=lambda x: x[1], reverse=True)
-        return results[:top_n]
+        all_results = []
+        offset = 0
+        for terms, survivors, prescores in plans:
+            fuzzy = fuzzy_scores[offset:offset + len(survivors)]
+            offset += len(survivors)
+            scores = prescores + fuzzy * FUZZY_WEIGHT
+            hit = scores > SCORE_CUTOFF
+            ids, fuzzy = survivors[hit], fuzzy[hit]
+            rounded = np.round(scores[hit], 1)
+            top = _top_order(rounded, top_n)
+            all_results.append([self._result(i, score, fuzzy_score, terms)
+                                for i, score, fuzzy_score in zip(ids[top].tolist(),
+                                                                 rounded[top].tolist(),
+                                                                 fuzzy[top].tolist())])
+        return all_results
+
+    def _query_terms(self, query_norm: str) -> tuple:
+        """
+        Parse a normalized query into the terms entries are scored on:
+        (type aliases, alias bitmask, conduit type, size, keywords).
+        """
+        query_aliases = set(_ALIAS_RE.findall(query_norm))
+        query_bits = 0
+        for alias in query_aliases:
+            query_bits |= _ALIAS_BITS[alias]
+
+        # If the query names a conduit type, entries whose section is about a
+        # DIFFERENT conduit type get penalized
+        query_tokens = query_norm.split()
+        query_conduit = None
+        for ct in CONDUIT_TYPES:
+            if ct in query_tokens:
+                query_conduit = ct
+                break
+
+        return (query_aliases, query_bits, query_conduit, extract_size(query_norm),
+                self._extract_keywords(query_norm))
+
+    def _prescores(self, terms: tuple) -> np.ndarray:
+        """Score every entry on everything but fuzzy similarity, as an array."""
+        query_aliases, _, query_conduit, query_size, keywords = terms
+        scores = np.zeros(len(self._rows), dtype=np.int64)
+        for alias in query_aliases:
+            scores[self._alias_postings[alias]] += 40
+        if query_conduit:
+            wrong_types = (self._conduit_counts -
+                           self._conduit_matrix[CONDUIT_TYPES.index(query_conduit)])
+            scores -= 25 * wrong_types
+        if query_size and query_size in self._size_postings:
+            scores[self._size_postings[query_size]] += 30
+        for kw in keywords:
+            scores[self._keyword_postings(kw)] += 15
+        return scores
+
+    def _reasons(self, i: int, terms: tuple) -> list:
+        """
+        List the prescore terms entry i matched, for match_reason. The
+        weights themselves live in _prescores().
+        """
+        (entry, section_lower, category_lower, item_lower, combined,
+         section_tokens, entry_size) = self._rows[i]
+        _, query_bits, query_conduit, query_size, keywords = terms
+        reasons = []
+
+        # Check type aliases
+        type_bits = query_bits & self._entry_type_bits[i]
+        if type_bits:
+            for alias, bit in _ALIAS_BITS.items():
+                if type_bits & bit:
+                    reasons.append(f"type_match:{alias}")
+
+        # If query is for EMT, entries in ENT/RIGID/PVC sections are penalized
+        if query_conduit:
+            for ct in CONDUIT_TYPES:
+                if ct != query_conduit and ct in section_tokens:
+                    reasons.append(f"wrong_type_penalty:{ct}")
+
+        # Size matching
+        if query_size and entry_size == query_size:
+            reasons.append(f"size_match:{query_size}")
+
+        # Keyword matching
+        for kw in keywords:
+            if kw in combined:
+                reasons.append(f"keyword:{kw}")
+
+        return reasons
+
+    def _result(self, i: int, score: float, fuzzy_score: int, terms: tuple) -> tuple:
+        """Build the (entry, score, match_reason) tuple for a scored entry."""
+        reasons = self._reasons(i, terms)
+        if fuzzy_score > 60:
+            reasons.append(f"fuzzy:{fuzzy_score}")
+        return self._rows[i][0], score, ', '.join(reasons)
+
+    def _keyword_postings(self, kw: str) -> np.ndarray:
+        """Return indexes of the entries whose combined text contains kw."""
+        ids = set()
+        # Keywords match as substrings, so check every indexed token
+        for token, postings in self._postings.items():
+            if kw in token:
+                ids.update(postings)
+        return np.fromiter(ids, dtype=np.intp, count=len(ids))
 
     def best_match(self, query: str) -> tuple:
         """Return the single best match with confidence score (0-100)."""
-        results = self.search(query, top_n=1)
-        if not results:
-            return None, 0, "No match found"
-        entry, raw_score, reason = results[0]
-        # Normalize score to 0-100
-        confidence = min(100, raw_score)
-        return entry, confidence, reason
+        return self.best_match_many([query])[0]
+
+    def best_match_many(self, queries: list) -> list:
+        """
+        Return best_match() for every query in a list, e.g. all parts of a
+        BOM. Queries not already cached are scored together in one batch.
+        """
+        cache = self._best_match_cache
+        matches = {}
+        pending = []
+        for query in dict.fromkeys(queries):
+            # One lookup: another request thread may clear the cache between
+            # a membership test and a read
+            hit = cache.get(query)
+            if hit is not None:
+                matches[query] = hit
+            else:
+                pending.append(query)
+
+        for query, results in zip(pending, self._search_many(pending, top_n=1)):
+            if not results:
+                matches[query] = None, 0, "No match found"
+            else:
+                entry, raw_score, reason = results[0]
+                # Normalize score to 0-100
+                confidence = min(100, raw_score)
+                matches[query] = entry, confidence, reason
+
+        if len(cache) + len(pending) > BEST_MATCH_CACHE_SIZE:
+            cache.clear()
+        for query in pending:
+            cache[query] = matches[query]
+        return [matches[query] for query in queries]
 
     def _extract_keywords(self, desc: str) -> list:
         """Extract meaningful keywords from a description."""
@@ -196,8 +480,8 @@ if __name__ == '__main__':
         entry, confidence, reason = matcher.best_match(q)
         if entry:
             print(f"\nQuery: '{q}'")
-            print(f"  Match: {entry['Section']} > {entry['Category']} > {entry['Item']}")
-            print(f"  Avg Labor: {entry['Average']} per {entry['Unit']}")
+            print(f"  Match: {entry.Section} > {entry.Category} > {entry.Item}")
+            print(f"  Avg Labor: {entry.Average} per {entry.Unit}")
             print(f"  Confidence: {confidence}  Reason: {reason}")
         else:
             print(f"\nQuery: '{q}' -> NO MATCH")
@@ -20,9 +20,16 @@ else:
     os.chdir(bundle_dir)
 
 def open_browser():
-    """Open browser after a short delay to let the server start."""
+    """Open the browser as soon as the server accepts connections."""
+    import socket
     import time
-    time.sleep(1.5)
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', 5000), timeout=0.05).close()
+            break
+        except OSError:
+            time.sleep(0.05)
     webbrowser.open('http://localhost:5000')
 
 if __name__ == '__main__':
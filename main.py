@@ -68,9 +68,16 @@ def main():
         from pdf_extractor import extract_labor_units
         extract_labor_units(args.pdf, args.labor_db)
     else:
-        import csv
-        with open(args.labor_db, encoding='utf-8') as f:
-            count = sum(1 for _ in csv.reader(f)) - 1
+        # The DB is written by pdf_extractor, one record per line, so
+        # counting newlines is enough; minus one for the header
+        count = -1
+        last = b'\n'
+        with open(args.labor_db, 'rb') as f:
+            while chunk := f.read(1 << 20):
+                count += chunk.count(b'\n')
+                last = chunk
+        if not last.endswith(b'\n'):
+            count += 1  # final record without a line ending
         print(f"\n[Phase 1] Labor DB exists: {count} entries in {args.labor_db}")
 
     # Interactive search mode
@@ -82,8 +89,8 @@ def main():
         print("-" * 80)
         for entry, score, reason in results:
             print(f"  Score: {score:>6.1f}  "
-                  f"{entry['Section']} > {entry['Category']} > {entry['Item']}  "
-                  f"Avg: {entry['Average']} per {entry['Unit']}")
+                  f"{entry.Section} > {entry.Category} > {entry.Item}  "
+                  f"Avg: {entry.Average} per {entry.Unit}")
         return
 
     # Step 2: Run estimation
@@ -3,12 +3,18 @@ Extract labor units from Labor_Units_Manual_2025 PDF into a structured CSV.
 Parses the consistent text format: SIZE values... PER_UNIT
 """
 
-import pdfplumber
 import csv
+import os
 import re
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+try:
+    import pymupdf  # PyMuPDF: much faster text extraction than pdfplumber
+except ImportError:
+    pymupdf = None
+
 logging.basicConfig(
     filename='data/process.log',
     level=logging.INFO,
@@ -16,117 +22,203 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-
-def extract_labor_units(pdf_path: str, output_path: str = "data/labor_units_db.csv"):
-    """Extract all labor unit tables from the PDF."""
-    pdf = pdfplumber.open(pdf_path)
-    all_rows = []
-    current_section = ""
-    current_category = ""
-    page_header_pattern = re.compile(
-        r'^(.+?)\s+LABOR\s+UNITS\s*$', re.IGNORECASE
-    )
-    # Pattern for the column header line
-    header_pattern = re.compile(
-        r'SIZE\s+CONDITIONS\s+EASY\s+AVERAGE\s+DIFFICULT\s+REMODEL\s+OLD\s+WORK\s*PER',
-        re.IGNORECASE
-    )
-    # Pattern for a data row: item/size followed by numeric values and unit letter
-    # Handles rows like: 1/2" 3.50 4.00 4.50 5.00 5.50 C
-    # And rows like: BOX MOUNTING BRACKETS 0.15 0.20 0.25 0.28 0.30 E
-    data_pattern = re.compile(
-        r'^(.+?)\s+'
-        r'(\d+\.?\d*)\s+'
-        r'(\d+\.?\d*)\s+'
-        r'(\d+\.?\d*)\s+'
-        r'(\d+\.?\d*)\s+'
-        r'(\d+\.?\d*)\s+'
-        r'([ECM])\s*$'
-    )
-    # Section markers from page footers like "1-1", "8-22", etc.
-    section_footer = re.compile(r'^(\d+)-(\d+)\s*$')
-    # Category headers - all caps lines that aren't data rows
-    category_pattern = re.compile(r'^([A-Z][A-Z\s&\-\/\(\)]+(?:\*)?)\s*$')
-
-    skipped_pages = 0
-    total_pages = len(pdf.pages)
-
-    for page_num in range(total_pages):
-        page = pdf.pages[page_num]
-        text = page.extract_text()
-        if not text:
-            skipped_pages += 1
+# Page header carrying the section title, e.g. "RIGID CONDUIT LABOR UNITS"
+_PAGE_HEADER_RE = re.compile(
+    r'^(.+?)\s+LABOR\s+UNITS\s*$', re.IGNORECASE
+)
+# Pattern for the column header line
+_COLUMN_HEADER_RE = re.compile(
+    r'SIZE\s+CONDITIONS\s+EASY\s+AVERAGE\s+DIFFICULT\s+REMODEL\s+OLD\s+WORK\s*PER',
+    re.IGNORECASE
+)
+# Pattern for a data row: item/size followed by numeric values and unit letter
+# Handles rows like: 1/2" 3.50 4.00 4.50 5.00 5.50 C
+# And rows like: BOX MOUNTING BRACKETS 0.15 0.20 0.25 0.28 0.30 E
+_DATA_RE = re.compile(
+    r'^(.+?)\s+'
+    r'(\d+\.?\d*)\s+'
+    r'(\d+\.?\d*)\s+'
+    r'(\d+\.?\d*)\s+'
+    r'(\d+\.?\d*)\s+'
+    r'(\d+\.?\d*)\s+'
+    r'([ECM])\s*$'
+)
+# Section markers from page footers like "1-1", "8-22", etc.
+_FOOTER_RE = re.compile(r'^(\d+)-(\d+)\s*$')
+# Category headers - all caps lines that aren't data rows
+_CATEGORY_RE = re.compile(r'^([A-Z][A-Z\s&\-\/\(\)]+(?:\*)?)\s*$')
+_DIGIT_RE = re.compile(r'\d')
+# All-caps lines that look like categories but are column/page header noise
+_NOT_CATEGORIES = frozenset(('SIZE CONDITIONS EASY AVERAGE DIFFICULT REMODEL OLD WORK PER',
+                             'PER', 'SIZE', 'LABOR UNITS'))
+
+
+def _pymupdf_page_text(page) -> str:
+    """
+    Page text with one line per visual row, like pdfplumber's extract_text().
+    PyMuPDF's own "text" output can put every table cell on a line of its
+    own, so lines are rebuilt from word boxes: words whose tops are within
+    3pt of the previous word's are one row, read left to right.
+    """
+    lines = []
+    row = []
+    last_top = None
+    for x0, top, _, _, word, *_ in sorted(page.get_text("words"), key=lambda w: w[1]):
+        if row and top - last_top > 3:
+            lines.append(' '.join(w for _, w in sorted(row)))
+            row = []
+        row.append((x0, word))
+        last_top = top
+    if row:
+        lines.append(' '.join(w for _, w in sorted(row)))
+    return '\n'.join(lines)
+
+
+def _page_count(pdf_path: str) -> int:
+    if pymupdf is not None:
+        with pymupdf.open(pdf_path) as doc:
+            return doc.page_count
+    import pdfplumber
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def _page_texts(pdf_path: str, start: int, stop: int):
+    """Yield the text of pages start..stop-1, using PyMuPDF when it is installed."""
+    if pymupdf is not None:
+        with pymupdf.open(pdf_path) as doc:
+            for page in doc.pages(start, stop):
+                yield _pymupdf_page_text(page)
+    else:
+        import pdfplumber
+        with pdfplumber.open(pdf_path) as pdf:
+            for page in pdf.pages[start:stop]:
+                yield page.extract_text()
+
+
+def _parse_page(text: str) -> list:
+    """
+    Parse one page's text into a list of events, in line order:
+    ('section', name), ('category', name) or ('row', (item, easy, average,
+    difficult, remodel, old_work, unit)). Returns None for a page with no
+    text. Sections and categories carry over between pages, so rows are
+    only assigned to them when the pages are merged in order.
+    """
+    if not text:
+        return None
+
+    # Locals for the per-line loop. This loop is a few percent of an
+    # extraction run (getting the text out of the PDF is the rest), so it
+    # stays plain Python rather than a compiled extension
+    page_header_match = _PAGE_HEADER_RE.match
+    header_search = _COLUMN_HEADER_RE.search
+    data_match_line = _DATA_RE.match
+    footer_match = _FOOTER_RE.match
+    category_match = _CATEGORY_RE.match
+    has_digit = _DIGIT_RE.search
+    events = []
+    add = events.append
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
             continue
 
-        lines = text.split('\n')
-        page_section = ""
-
-        for line in lines:
-            line = line.strip()
-            if not line:
+        # Data rows are the common case and always end in a unit letter,
+        # which page header, footer and category lines never do, so they
+        # are tried first. Column header and copyright lines are skipped
+        # even if they look like data rows.
+        if line[-1] in 'ECM':
+            data_match = data_match_line(line)
+            if data_match:
+                if not (header_search(line) or ('1988' in line and 'Durand' in line)):
+                    add(('row', (data_match.group(1).strip(),) + data_match.groups()[1:]))
                 continue
 
-            # Check for page header (section title)
-            header_match = page_header_pattern.match(line)
-            if header_match:
-                page_section = header_match.group(1).strip()
-                current_section = page_section
-                continue
+        # Check for page header (section title)
+        header_match = page_header_match(line)
+        if header_match:
+            add(('section', header_match.group(1).strip()))
+            continue
 
-            # Skip column header lines
-            if header_pattern.search(line):
-                continue
+        # Skip column header lines
+        if header_search(line):
+            continue
 
-            # Skip copyright lines
-            if '1988' in line and 'Durand' in line:
-                continue
+        # Skip copyright lines
+        if '1988' in line and 'Durand' in line:
+            continue
 
-            # Skip footer page numbers
-            if section_footer.match(line):
+        first = line[0]
+        # Skip footer page numbers
+        if first.isdigit():
+            if footer_match(line):
                 continue
 
-            # Check for category subheader
-            cat_match = category_pattern.match(line)
+        # Check for category subheader
+        elif first.isupper():
+            cat_match = category_match(line)
             if cat_match:
                 potential_cat = cat_match.group(1).strip()
                 # Make sure it's not a data row (shouldn't have numbers)
-                if not re.search(r'\d', potential_cat) and len(potential_cat) > 2:
+                if not has_digit(potential_cat) and len(potential_cat) > 2:
                     # Filter out noise
-                    if potential_cat not in ('SIZE CONDITIONS EASY AVERAGE DIFFICULT REMODEL OLD WORK PER',
-                                             'PER', 'SIZE', 'LABOR UNITS'):
-                        current_category = potential_cat.rstrip('*').strip()
-                        continue
+                    if potential_cat not in _NOT_CATEGORIES:
+                        add(('category', potential_cat.rstrip('*').strip()))
+    return events
 
-            # Try to parse as data row
-            data_match = data_pattern.match(line)
-            if data_match:
-                item = data_match.group(1).strip()
-                easy = data_match.group(2)
-                average = data_match.group(3)
-                difficult = data_match.group(4)
-                remodel = data_match.group(5)
-                old_work = data_match.group(6)
-                unit = data_match.group(7)
-
-                all_rows.append({
-                    'Section': current_section,
-                    'Category': current_category,
-                    'Item': item,
-                    'Easy': float(easy),
-                    'Average': float(average),
-                    'Difficult': float(difficult),
-                    'Remodel': float(remodel),
-                    'Old_Work': float(old_work),
-                    'Unit': unit
-                })
+
+def _parse_pages(task: tuple) -> list:
+    """Worker: parse pages start..stop-1 of a PDF; one _parse_page() result per page."""
+    pdf_path, start, stop = task
+    return [_parse_page(text) for text in _page_texts(pdf_path, start, stop)]
+
+
+def extract_labor_units(pdf_path: str, output_path: str = "data/labor_units_db.csv"):
+    """
+    Extract all labor unit tables from the PDF.
+    Pages are parsed in parallel worker processes, then merged in page order.
+    Returns the rows as (Section, Category, Item, Easy, Average, Difficult,
+    Remodel, Old_Work, Unit) tuples.
+    """
+    total_pages = _page_count(pdf_path)
+    # One contiguous page range per worker, since opening the PDF is not free
+    workers = max(1, min(os.cpu_count() or 1, total_pages))
+    bounds = [total_pages * k // workers for k in range(workers + 1)]
+    tasks = [(pdf_path, start, stop) for start, stop in zip(bounds, bounds[1:])]
+    if workers == 1:
+        pages = _parse_pages(tasks[0])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pages = [page for chunk in pool.map(_parse_pages, tasks) for page in chunk]
+
+    all_rows = []
+    add_row = all_rows.append
+    current_section = ""
+    current_category = ""
+    skipped_pages = 0
+    for events in pages:
+        if events is None:
+            skipped_pages += 1
+            continue
+
+        for kind, value in events:
+            if kind == 'section':
+                current_section = value
+            elif kind == 'category':
+                current_category = value
+            else:
+                item, easy, average, difficult, remodel, old_work, unit = value
+                add_row((current_section, current_category, item, float(easy),
+                         float(average), float(difficult), float(remodel),
+                         float(old_work), unit))
 
     # Write to CSV
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
     fieldnames = ['Section', 'Category', 'Item', 'Easy', 'Average', 'Difficult',
                   'Remodel', 'Old_Work', 'Unit']
     with open(output_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
         writer.writerows(all_rows)
 
     logger.info(f"Extracted {len(all_rows)} labor unit entries from {total_pages} pages "
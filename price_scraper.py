@@ -8,20 +8,30 @@ Prices require a logged-in session (GraphQL with session customerId),
 so they are marked for manual lookup unless a browser-based approach is used.
 """
 
-import requests
-from bs4 import BeautifulSoup
+import atexit
 import csv
 import json
 import time
 import re
 import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from urllib.parse import quote_plus
 
+try:
+    import orjson  # faster cache (de)serialization than the stdlib json module
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 CACHE_DIR = Path("data/cache")
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
+CACHE_DB = CACHE_DIR / "price_cache.db"
+# Older versions kept the whole cache in one JSON file; it is migrated into
+# CACHE_DB on first use
 CACHE_FILE = CACHE_DIR / "price_cache.json"
 
 HEADERS = {
@@ -31,30 +41,145 @@ HEADERS = {
     'Accept-Language': 'en-US,en;q=0.5',
 }
 
+# Fields in the text of a Platt product card
+_ITEM_RE = re.compile(r'Item\s*#:\s*(\d+)')
+_CAT_RE = re.compile(r'CAT\s*#:\s*([\w\-]+)')
+_NON_DIGIT_RE = re.compile(r'[^0-9]')
+
 # Rate limiting
 MIN_REQUEST_INTERVAL = 2.0  # seconds between requests
 _last_request_time = 0
+_rate_lock = threading.Lock()
+
+# Concurrent lookups for scrape_many and batch_scrape
+MAX_WORKERS = 16
+
+# One session for every request, so connections (and TLS) to Platt are
+# reused; the pool is sized for the worker threads. Gateway errors are
+# retried, and the last response is returned rather than raised.
+# Requests start at most one per MIN_REQUEST_INTERVAL, so an HTTP/2 client
+# would have little to multiplex over these kept-alive connections.
+# Created by _get_session() on first use, so importing this module (e.g.
+# for a --no-scrape run) doesn't pull in requests.
+_SESSION = None
+_session_lock = threading.Lock()
+
+# In-memory price cache, loaded from CACHE_DB on first use. Entries added
+# since the last flush_cache() are kept in _cache_pending, so a flush
+# writes only those rows rather than the whole cache
+_CACHE = None
+_cache_pending = {}
+_cache_lock = threading.Lock()
 
 
 def _rate_limit():
-    """Enforce minimum delay between requests."""
+    """Enforce minimum delay between requests, across all threads."""
     global _last_request_time
-    elapsed = time.time() - _last_request_time
-    if elapsed < MIN_REQUEST_INTERVAL:
-        time.sleep(MIN_REQUEST_INTERVAL - elapsed)
-    _last_request_time = time.time()
+    # Reserve the next free slot under the lock, then sleep outside it
+    with _rate_lock:
+        now = time.time()
+        start = max(now, _last_request_time + MIN_REQUEST_INTERVAL)
+        _last_request_time = start
+    if start > now:
+        time.sleep(start - now)
+
+
+def _get_session():
+    """Return the shared requests session, creating it on first use."""
+    global _SESSION
+    if _SESSION is None:
+        with _session_lock:
+            if _SESSION is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+                session = requests.Session()
+                session.headers.update(HEADERS)
+                adapter = HTTPAdapter(
+                    pool_connections=MAX_WORKERS,
+                    pool_maxsize=MAX_WORKERS,
+                    max_retries=Retry(total=2, backoff_factor=0.3,
+                                      status_forcelist=[502, 503, 504],
+                                      raise_on_status=False),
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _SESSION = session
+    return _SESSION
+
+
+def _dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(data: bytes):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(CACHE_DB)
+    conn.execute('CREATE TABLE IF NOT EXISTS price_cache '
+                 '(key TEXT PRIMARY KEY, value BLOB NOT NULL)')
+    return conn
 
 
 def _load_cache() -> dict:
-    if CACHE_FILE.exists():
-        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
+    conn = _connect()
+    try:
+        if CACHE_FILE.exists():
+            # One-off migration of the old JSON cache; rows already in the
+            # database are newer, so they win
+            legacy = _loads(CACHE_FILE.read_bytes())
+            with conn:
+                conn.executemany('INSERT OR IGNORE INTO price_cache (key, value) VALUES (?, ?)',
+                                 [(key, _dumps(value)) for key, value in legacy.items()])
+            CACHE_FILE.unlink()
+            logger.info(f"Migrated {len(legacy)} cached prices from {CACHE_FILE} to {CACHE_DB}")
+        return {key: _loads(value)
+                for key, value in conn.execute('SELECT key, value FROM price_cache')}
+    finally:
+        conn.close()
+
+
+def _save_cache(entries: dict):
+    """Insert or update the given entries in CACHE_DB."""
+    conn = _connect()
+    try:
+        with conn:
+            conn.executemany('INSERT OR REPLACE INTO price_cache (key, value) VALUES (?, ?)',
+                             [(key, _dumps(value)) for key, value in entries.items()])
+    finally:
+        conn.close()
+
 
+def _get_cache() -> dict:
+    """Return the in-memory price cache, loading it from disk once."""
+    global _CACHE
+    if _CACHE is None:
+        with _cache_lock:
+            if _CACHE is None:
+                _CACHE = _load_cache()
+    return _CACHE
 
-def _save_cache(cache: dict):
-    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-        json.dump(cache, f, indent=2)
+
+def _cache_put(key: str, result: dict):
+    cache = _get_cache()
+    with _cache_lock:
+        cache[key] = _cache_pending[key] = dict(result)
+
+
+def flush_cache():
+    """Write the entries added since the last flush to the on-disk cache."""
+    with _cache_lock:
+        if _cache_pending:
+            _save_cache(_cache_pending)
+            _cache_pending.clear()
+
+
+# Catch anything added outside scrape_many/batch_scrape
+atexit.register(flush_cache)
 
 
 def _cache_key(vendor: str, query: str) -> str:
@@ -71,7 +196,9 @@ def scrape_platt(query: str, platt_id: str = "") -> dict:
     the server-rendered HTML. Prices show as "Login for pricing"
     unless fetched via browser automation.
     """
-    cache = _load_cache()
+    from requests import RequestException
+
+    cache = _get_cache()
 
     # Use platt_id if available, otherwise search by description
     search_term = platt_id if platt_id else query
@@ -79,7 +206,8 @@ def scrape_platt(query: str, platt_id: str = "") -> dict:
 
     if key in cache:
         logger.info(f"Cache hit for Platt: {search_term}")
-        return cache[key]
+        # Copy, so callers can't modify the cached entry
+        return dict(cache[key])
 
     result = {
         'vendor': 'Platt',
@@ -102,7 +230,7 @@ def scrape_platt(query: str, platt_id: str = "") -> dict:
         search_url = f"https://www.platt.com/s/search?q={quote_plus(search_query)}"
         result['url'] = search_url
 
-        response = requests.get(search_url, headers=HEADERS, timeout=15, allow_redirects=True)
+        response = _get_session().get(search_url, timeout=15, allow_redirects=True)
 
         if response.status_code == 403:
             result['error'] = 'Access denied (403) - may need manual lookup'
@@ -113,15 +241,42 @@ def scrape_platt(query: str, platt_id: str = "") -> dict:
             result['error'] = f'HTTP {response.status_code}'
             logger.warning(f"Platt HTTP {response.status_code} for: {search_term}")
 
-    except requests.RequestException as e:
+    except RequestException as e:
         result['error'] = str(e)
         logger.error(f"Platt request error for {search_term}: {e}")
 
-    cache[key] = result
-    _save_cache(cache)
+    _cache_put(key, result)
     return result
 
 
+def _product_id(href: str) -> str:
+    """Item ID from a product href like /p/{item_id}/slug/... or /p/{item_id}, or '' if it has none."""
+    id_end = href.find('/', 3)
+    if id_end == -1:
+        id_end = len(href)
+    item_id = href[3:id_end]
+    return item_id if item_id.isdecimal() else ''
+
+
+def _card_text(link) -> str:
+    """
+    Text of the product card around a product link: its largest ancestor
+    that contains no link to a different product.
+    """
+    own = link.attributes.get('href') or ''
+    own = _product_id(own) or own
+    card = link
+    node = link.parent
+    while node is not None:
+        for other in node.css('a[href^="/p/"]'):
+            href = other.attributes.get('href') or ''
+            if (_product_id(href) or href) != own:
+                return card.text(separator=' ', strip=True)
+        card = node
+        node = node.parent
+    return card.text(separator=' ', strip=True)
+
+
 def _parse_platt_search(html: str, result: dict, final_url: str, platt_id: str = ""):
     """
     Parse Platt search results page.
@@ -129,27 +284,30 @@ def _parse_platt_search(html: str, result: dict, final_url: str, platt_id: str =
     with <h2> containing the product name.
     Prices are loaded client-side via GraphQL and won't be in the HTML.
     """
+    from selectolax.lexbor import LexborHTMLParser
+
     result['url'] = final_url
-    soup = BeautifulSoup(html, 'html.parser')
+    tree = LexborHTMLParser(html)
 
     # Find all product links: /p/{item_id}/slug/upc/cat
-    product_links = soup.find_all('a', href=re.compile(r'^/p/\d+'))
+    # (the selector guarantees the /p/ prefix; the ID must start with a digit)
+    product_links = [link for link in tree.css('a[href^="/p/"]')
+                     if (link.attributes.get('href') or '')[3:4].isdecimal()]
     seen_urls = set()
     products = []
 
     for link in product_links:
-        href = link.get('href', '')
+        href = link.attributes.get('href') or ''
         if href in seen_urls:
             continue
         seen_urls.add(href)
 
         # Extract item ID from URL
-        id_match = re.search(r'/p/(\d+)/', href)
-        item_id = id_match.group(1) if id_match else ''
+        item_id = _product_id(href)
 
         # Get product name from <h2> inside the link
-        h2 = link.find('h2')
-        name = h2.get_text(strip=True) if h2 else ''
+        h2 = link.css_first('h2')
+        name = h2.text(strip=True) if h2 else ''
         if not name:
             continue
 
@@ -157,45 +315,35 @@ def _parse_platt_search(html: str, result: dict, final_url: str, platt_id: str =
             'item_id': item_id,
             'name': name,
             'url': f"https://www.platt.com{href}",
+            'link': link,
         })
 
     if not products:
         result['error'] = 'No products found - try different search terms'
         return
 
-    # If we have a specific platt_id, find that exact product
+    # If we have a specific platt_id, find that exact product; otherwise
+    # (or if it isn't in the results) use the first, most relevant, result
+    product = products[0]
     if platt_id:
         for p in products:
             if p['item_id'] == platt_id:
-                result['name'] = p['name']
-                result['url'] = p['url']
-                result['platt_item_id'] = p['item_id']
+                product = p
                 break
-        else:
-            # Platt ID not found in results, use first result
-            result['name'] = products[0]['name']
-            result['url'] = products[0]['url']
-            result['platt_item_id'] = products[0]['item_id']
-    else:
-        # Use first result (most relevant)
-        result['name'] = products[0]['name']
-        result['url'] = products[0]['url']
-        result['platt_item_id'] = products[0]['item_id']
-
-    # Also look for item details in the HTML
-    # Item #, CAT #, UPC are in text nodes near the product link
-    text = html
-    item_idx = text.find(f"/p/{result['platt_item_id']}/")
-    if item_idx > 0:
-        context = text[item_idx:item_idx + 2000]
-        # Try to find "Item #: NNNNNNN"
-        item_match = re.search(r'Item\s*#:\s*(\d+)', context)
-        if item_match:
-            result['platt_item_id'] = item_match.group(1)
-        # Try to find CAT #
-        cat_match = re.search(r'CAT\s*#:\s*([\w\-]+)', context)
-        if cat_match:
-            result['cat_number'] = cat_match.group(1)
+    result['name'] = product['name']
+    result['url'] = product['url']
+    result['platt_item_id'] = product['item_id']
+
+    # Item #, CAT #, UPC are in the text of the product's card
+    context = _card_text(product['link'])
+    # Try to find "Item #: NNNNNNN"
+    item_match = _ITEM_RE.search(context)
+    if item_match:
+        result['platt_item_id'] = item_match.group(1)
+    # Try to find CAT #
+    cat_match = _CAT_RE.search(context)
+    if cat_match:
+        result['cat_number'] = cat_match.group(1)
 
     # Price note - Platt renders prices via client-side JS/GraphQL
     result['price_str'] = 'Login for pricing'
@@ -222,23 +370,76 @@ def scrape_vendor(query: str, vendor: str = "platt", platt_id: str = "") -> dict
         }
 
 
+def _lookup_key(vendor: str, query: str, platt_id: str = "") -> str:
+    """
+    Cache key scrape_vendor() stores this lookup under; lookups with the
+    same key get the same result, so they only need scraping once.
+    """
+    if vendor.lower() == "platt":
+        return _cache_key("platt", platt_id or query)
+    return _cache_key(vendor, query)
+
+
+def scrape_many(queries: list, vendor: str = "platt", max_workers: int = MAX_WORKERS,
+                progress=None) -> list:
+    """
+    Scrape a list of (query, platt_id) pairs concurrently.
+    Pairs that share a cache key are scraped once; results are returned in
+    input order. If given, progress(query, result) is called as each
+    lookup finishes.
+    """
+    if not queries:
+        return []
+    keys = [_lookup_key(vendor, query, platt_id) for query, platt_id in queries]
+    jobs = {}
+    for key, job in zip(keys, queries):
+        jobs.setdefault(key, job)
+
+    scraped = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+        futures = {pool.submit(scrape_vendor, query, vendor, platt_id): key
+                   for key, (query, platt_id) in jobs.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            scraped[key] = result = future.result()
+            if progress is not None:
+                progress(jobs[key][0], result)
+    flush_cache()
+    # A copy per query, so repeated parts don't share one dict
+    return [dict(scraped[key]) for key in keys]
+
+
 def batch_scrape(parts: list, vendor: str = "platt") -> list:
     """
-    Scrape prices for a list of parts.
+    Scrape prices for a list of parts, concurrently; results are in input order.
     Each part should be a dict with 'description' and optionally 'platt_id'.
+    Parts that share a cache key are only scraped once.
     """
     from tqdm import tqdm
-    results = []
-    for part in tqdm(parts, desc=f"Fetching {vendor} prices"):
+    descs = []
+    keys = []
+    jobs = {}
+    for part in parts:
         desc = part.get('description', part.get('Part', ''))
         platt_id = part.get('platt_id', part.get('Exact Item Number Platt', ''))
         # Clean up platt_id
         if platt_id:
-            platt_id = re.sub(r'[^0-9]', '', str(platt_id))
-        result = scrape_vendor(desc, vendor, platt_id)
-        result['original_description'] = desc
-        results.append(result)
-    return results
+            platt_id = _NON_DIGIT_RE.sub('', str(platt_id))
+        key = _lookup_key(vendor, desc, platt_id)
+        descs.append(desc)
+        keys.append(key)
+        jobs.setdefault(key, (desc, platt_id))
+
+    scraped = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(jobs)))) as pool:
+        futures = {pool.submit(scrape_vendor, desc, vendor, platt_id): key
+                   for key, (desc, platt_id) in jobs.items()}
+        for future in tqdm(as_completed(futures), total=len(futures),
+                           desc=f"Fetching {vendor} prices"):
+            scraped[futures[future]] = future.result()
+    flush_cache()
+    return [dict(scraped[key], original_description=desc)
+            for key, desc in zip(keys, descs)]
 
 
 if __name__ == '__main__':
@@ -1,13 +1,16 @@
 """Test Platt scraping with correct URL and HTML parsing."""
 import requests
 import re
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 
 headers = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
     'Accept': 'text/html,application/xhtml+xml',
 }
 
+PRICE_RE = re.compile(r'\$\s*([\d,]+\.?\d*)\s*(FT|EA|C|M)')
+STOCK_RE = re.compile(r'([\d,]+)\s+in\s+stock')
+
 def test_search(query):
     print(f"\n{'='*60}")
     print(f"Searching Platt for: '{query}'")
@@ -15,27 +18,31 @@ def test_search(query):
     r = requests.get(url, headers=headers, timeout=15)
     print(f"  Status: {r.status_code}, Length: {len(r.text)}")
 
-    soup = BeautifulSoup(r.text, 'html.parser')
+    tree = LexborHTMLParser(r.text)
 
     # Find product links - pattern /p/{id}/...
-    product_links = soup.find_all('a', href=re.compile(r'^/p/\d+'))
+    # (the selector guarantees the /p/ prefix; the ID must start with a digit)
+    product_links = [link for link in tree.css('a[href^="/p/"]')
+                     if (link.attributes.get('href') or '')[3:4].isdecimal()]
     print(f"  Found {len(product_links)} product links")
 
     seen_urls = set()
     products = []
     for link in product_links:
-        href = link.get('href', '')
+        href = link.attributes.get('href') or ''
         if href in seen_urls:
             continue
         seen_urls.add(href)
 
-        # Extract item number from URL: /p/0065970/...
-        id_match = re.search(r'/p/(\d+)/', href)
-        item_id = id_match.group(1) if id_match else ''
+        # Extract item number from URL: /p/0065970/... or /p/0065970
+        id_end = href.find('/', 3)
+        if id_end == -1:
+            id_end = len(href)
+        item_id = href[3:id_end] if href[3:id_end].isdecimal() else ''
 
         # Get product name from h2 inside the link
-        h2 = link.find('h2')
-        name = h2.get_text(strip=True) if h2 else ''
+        h2 = link.css_first('h2')
+        name = h2.text(strip=True) if h2 else ''
 
         if not name:
             continue
@@ -49,12 +56,12 @@ def test_search(query):
             parent = parent.parent
             if parent is None:
                 break
-            text = parent.get_text(' ', strip=True)
-            price_match = re.search(r'\$\s*([\d,]+\.?\d*)\s*(FT|EA|C|M)', text)
+            text = parent.text(separator=' ', strip=True)
+            price_match = PRICE_RE.search(text)
             if price_match:
                 price = float(price_match.group(1).replace(',', ''))
                 price_unit = price_match.group(2)
-                stock_match = re.search(r'([\d,]+)\s+in\s+stock', text)
+                stock_match = STOCK_RE.search(text)
                 if stock_match:
                     stock = stock_match.group(1)
                 break